@@ -5,16 +5,170 @@ Analyzes Python files and returns structured AST information for rule processing
 """
 
 import ast
+import hashlib
 import json
+import os
 import sys
+import tempfile
+import time
 import traceback
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+# Issue types and severities shared by every reported issue
+_CODE_SMELL = 'code_smell'
+_POTENTIAL_ISSUE = 'potential_issue'
+_SUGGESTION = 'suggestion'
+_WARNING = 'warning'
+_INFO = 'info'
+
+# Every rule the analyzer can report
+_ALL_RULES = frozenset((
+    'long-function', 'missing-docstring', 'high-complexity', 'unused-variable',
+    'bare-except', 'mutable-default-argument', 'comparison-with-singleton',
+    'old-string-formatting',
+))
+
+# Literal node types that make a mutable default argument
+_MUTABLE_LITERAL_TYPES = frozenset((ast.List, ast.Dict, ast.Set))
+
+# Common variable names that might be intentionally unused
+_UNUSED_EXCLUDES = frozenset(('_', '__', 'self', 'cls'))
+
+# Node types that each add one path to a function's cyclomatic complexity
+_BRANCH_TYPES = frozenset((ast.If, ast.While, ast.For, ast.AsyncFor, ast.ExceptHandler, ast.With))
+
+# Analysis results are cached on disk, keyed by the source contents, so that
+# re-analyzing an unchanged file skips parsing and traversal entirely.
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'code-surfer' / 'analysis'
+
+# Entries kept on disk; older ones are pruned by modification time, which is
+# refreshed on every hit. Pruning runs on the first write and then every
+# _CACHE_PRUNE_INTERVAL writes so batch runs do not rescan the directory per file.
+_CACHE_MAX_ENTRIES = 1000
+_CACHE_PRUNE_INTERVAL = 100
+# Temporary files older than this (in seconds) were left by a killed writer
+_CACHE_TMP_MAX_AGE = 600
+
+_cache_stats = {'hits': 0, 'misses': 0}
+_cache_writes = 0
+_analyzer_fingerprint: Optional[str] = None
+
+
+def _cache_key(content: str, enabled_rules: FrozenSet[str]) -> str:
+    """Build a cache key from the source, the interpreter, this analyzer and its rules."""
+    global _analyzer_fingerprint
+    if _analyzer_fingerprint is None:
+        # Results depend on the analyzer itself, so edits to it invalidate the cache
+        _analyzer_fingerprint = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    
+    data = content.encode('utf-8', 'surrogatepass')
+    digest = xxhash.xxh3_128_hexdigest(data) if xxhash else hashlib.sha256(data).hexdigest()
+    key = f"{digest}-{sys.implementation.cache_tag}-{_analyzer_fingerprint}"
+    if enabled_rules != _ALL_RULES:
+        key += '-' + hashlib.sha256(','.join(sorted(enabled_rules)).encode()).hexdigest()[:16]
+    return key
+
+
+def _load_cached(key: str) -> Optional[Dict[str, Any]]:
+    """Return cached analysis results for a key, or None on a miss."""
+    cache_path = CACHE_DIR / f"{key}.json"
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        _cache_stats['misses'] += 1
+        return None
+    
+    # Mark the entry as recently used so pruning keeps it
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    
+    _cache_stats['hits'] += 1
+    return cached
+
+
+def _store_cached(key: str, results: Dict[str, Any]) -> None:
+    """Write analysis results to the cache, ignoring any I/O failure."""
+    global _cache_writes
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    except OSError:
+        return
+    
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(results, file)
+        os.replace(tmp_path, CACHE_DIR / f"{key}.json")
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return
+    
+    if _cache_writes % _CACHE_PRUNE_INTERVAL == 0:
+        _prune_cache()
+    _cache_writes += 1
+
+
+def _prune_cache() -> None:
+    """Delete stale temporary files, entries from other analyzer versions and all but the newest entries."""
+    entries = []
+    tmp_cutoff = time.time() - _CACHE_TMP_MAX_AGE
+    try:
+        with os.scandir(CACHE_DIR) as scan:
+            for entry in scan:
+                try:
+                    if entry.name.endswith('.tmp'):
+                        # Recent ones may still be being written by another process
+                        if entry.stat().st_mtime < tmp_cutoff:
+                            os.unlink(entry.path)
+                        continue
+                    if not entry.name.endswith('.json'):
+                        continue
+                    
+                    # Keys are digest-cache_tag-fingerprint[-rules]
+                    if _analyzer_fingerprint not in entry.name[:-len('.json')].split('-'):
+                        os.unlink(entry.path)
+                    else:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+    except OSError:
+        return
+    
+    entries.sort(reverse=True)
+    for _, path in entries[_CACHE_MAX_ENTRIES:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
 
 
 class PythonASTAnalyzer:
     """Analyzes Python files using the AST module."""
     
-    def __init__(self):
+    def __init__(self, enabled_rules: Optional[FrozenSet[str]] = None):
+        # Issues for rules outside this set are never built
+        self.enabled_rules = _ALL_RULES if enabled_rules is None else enabled_rules
         self.issues: List[Dict[str, Any]] = []
         self.symbols: Dict[str, List[Dict[str, Any]]] = {
             'functions': [],
@@ -29,10 +183,20 @@ class PythonASTAnalyzer:
             with open(file_path, 'r', encoding='utf-8') as file:
                 content = file.read()
             
-            tree = ast.parse(content, filename=file_path)
-            
-            # Visit the AST and collect information
-            self._analyze_node(tree, content.splitlines())
+            key = _cache_key(content, self.enabled_rules)
+            cached = _load_cached(key)
+            if cached is not None:
+                self.symbols = cached['symbols']
+                self.issues = cached['issues']
+            else:
+                # Deliberately not PyCF_OPTIMIZED_AST (3.13+): its constant folding
+                # rewrites `'%s' % (x,)` into an f-string, hiding it from the
+                # old-string-formatting check, and does not make parsing faster
+                tree = ast.parse(content, filename=file_path)
+                
+                # Visit the AST and collect information
+                self._analyze_node(tree)
+                _store_cached(key, {'symbols': self.symbols, 'issues': self.issues})
             
             return {
                 'success': True,
@@ -54,39 +218,100 @@ class PythonASTAnalyzer:
                 'success': False,
                 'error': 'parse_error',
                 'message': str(e),
-                'traceback': traceback.format_exc()
+                # Formatting walks every frame and reads source files, so
+                # only pay for it when debugging
+                'traceback': traceback.format_exc() if os.environ.get('CODE_SURFER_DEBUG') else None
             }
     
-    def _analyze_node(self, node: ast.AST, lines: List[str]) -> None:
-        """Recursively analyze AST nodes."""
+    def _analyze_node(self, node: ast.AST) -> None:
+        """Analyze the AST in a single pass, dispatching on node type."""
         # Collect all names that are used (read)
         used_names = set()
-        # Collect all names that are defined (stored)
-        defined_names = set()
+        # Collect all names that are defined (stored), with their first line
+        defined_names: Dict[str, int] = {}
+        # Functions enclosing the current node, innermost last
+        func_stack: List[Tuple[ast.FunctionDef, Dict[str, Any]]] = []
+        # Nodes left to visit in source order; None marks leaving a function
+        stack: List[Optional[ast.AST]] = [node]
+        
+        def on_function(child: ast.FunctionDef) -> None:
+            func_stack.append((child, self._analyze_function(child)))
+            stack.append(None)
+            defined_names.setdefault(child.name, child.lineno)
         
-        for child in ast.walk(node):
-            if isinstance(child, ast.FunctionDef):
-                self._analyze_function(child, lines)
-                defined_names.add(child.name)
-            elif isinstance(child, ast.ClassDef):
-                self._analyze_class(child, lines)
-                defined_names.add(child.name) 
-            elif isinstance(child, ast.Name):
-                if isinstance(child.ctx, ast.Store):
-                    self._analyze_variable(child, lines)
-                    defined_names.add(child.id)
-                elif isinstance(child.ctx, ast.Load):
+        def on_class(child: ast.ClassDef) -> None:
+            self._analyze_class(child)
+            defined_names.setdefault(child.name, child.lineno)
+        
+        handlers = {
+            ast.FunctionDef: on_function,
+            ast.ClassDef: on_class,
+            ast.Import: self._analyze_import,
+            ast.ImportFrom: self._analyze_import,
+        }
+        
+        # The loop below runs once per node, so bind its lookups to locals
+        ast_node, name_node, store_ctx, load_ctx = ast.AST, ast.Name, ast.Store, ast.Load
+        get_handler = handlers.get
+        get_check = _CHECK_DISPATCH.get
+        branch_types, bool_op = _BRANCH_TYPES, ast.BoolOp
+        
+        while stack:
+            child = stack.pop()
+            if child is None:
+                # All of the function's nodes have been counted
+                func_node, func_info = func_stack.pop()
+                if func_stack:
+                    # Nested functions count towards the enclosing function too
+                    func_stack[-1][1]['complexity'] += func_info['complexity'] - 1
+                self._check_function_issues(func_node, func_info)
+                continue
+            
+            node_type = type(child)
+            
+            # Names are by far the most common node and need no other checks,
+            # so they are handled inline rather than through a handler call
+            if node_type is name_node:
+                ctx_type = type(child.ctx)
+                if ctx_type is store_ctx:
+                    self._analyze_variable(child)
+                    defined_names.setdefault(child.id, child.lineno)
+                elif ctx_type is load_ctx:
                     used_names.add(child.id)
-            elif isinstance(child, (ast.Import, ast.ImportFrom)):
-                self._analyze_import(child, lines)
+                continue
+            
+            handler = get_handler(node_type)
+            if handler:
+                handler(child)
+            
+            check = get_check(node_type)
+            if check:
+                check(self, child)
+            
+            # Each branch adds one path, and each extra boolean operand another
+            if func_stack:
+                if node_type in branch_types:
+                    func_stack[-1][1]['complexity'] += 1
+                elif node_type is bool_op:
+                    func_stack[-1][1]['complexity'] += len(child.values) - 1
+            
+            # Queue children without the generator layers of ast.iter_child_nodes
+            children = []
+            for field in child._fields:
+                value = getattr(child, field, None)
+                if type(value) is list:
+                    for item in value:
+                        if isinstance(item, ast_node):
+                            children.append(item)
+                elif isinstance(value, ast_node):
+                    children.append(value)
+            children.reverse()
+            stack.extend(children)
         
         # Check for unused variables (defined but not used)
-        self._check_unused_variables(defined_names, used_names, lines)
-        
-        # Check for additional Python-specific issues
-        self._check_python_specific_issues(node, lines)
+        self._check_unused_variables(defined_names, used_names)
     
-    def _analyze_function(self, node: ast.FunctionDef, lines: List[str]) -> None:
+    def _analyze_function(self, node: ast.FunctionDef) -> Dict[str, Any]:
         """Analyze function definitions."""
         func_info = {
             'name': node.name,
@@ -96,15 +321,13 @@ class PythonASTAnalyzer:
             'decorators': [self._get_decorator_name(dec) for dec in node.decorator_list],
             'is_async': isinstance(node, ast.AsyncFunctionDef),
             'has_docstring': self._has_docstring(node),
-            'complexity': self._calculate_complexity(node)
+            'complexity': 1  # Incremented while the function body is walked
         }
         
         self.symbols['functions'].append(func_info)
-        
-        # Check for common issues
-        self._check_function_issues(node, func_info, lines)
+        return func_info
     
-    def _analyze_class(self, node: ast.ClassDef, lines: List[str]) -> None:
+    def _analyze_class(self, node: ast.ClassDef) -> None:
         """Analyze class definitions."""
         class_info = {
             'name': node.name,
@@ -123,7 +346,7 @@ class PythonASTAnalyzer:
         
         self.symbols['classes'].append(class_info)
     
-    def _analyze_variable(self, node: ast.Name, lines: List[str]) -> None:
+    def _analyze_variable(self, node: ast.Name) -> None:
         """Analyze variable assignments."""
         var_info = {
             'name': node.id,
@@ -133,7 +356,7 @@ class PythonASTAnalyzer:
         
         self.symbols['variables'].append(var_info)
     
-    def _analyze_import(self, node, lines: List[str]) -> None:
+    def _analyze_import(self, node) -> None:
         """Analyze import statements."""
         if isinstance(node, ast.Import):
             for alias in node.names:
@@ -156,113 +379,88 @@ class PythonASTAnalyzer:
                 }
                 self.symbols['imports'].append(import_info)
     
-    def _check_function_issues(self, node: ast.FunctionDef, func_info: Dict[str, Any], lines: List[str]) -> None:
+    def _emit(self, rule: str, issue_type: str, severity: str, line: int, message: str, *args: Any) -> None:
+        """Record an issue if its rule is enabled.
+        
+        The message is a str.format template filled from args only after the
+        rule check, so disabled rules never pay for formatting it.
+        """
+        if rule not in self.enabled_rules:
+            return
+        
+        self.issues.append({
+            'type': issue_type,
+            'severity': severity,
+            'message': message.format(*args) if args else message,
+            'line': line,
+            'rule': rule
+        })
+    
+    def _check_function_issues(self, node: ast.FunctionDef, func_info: Dict[str, Any]) -> None:
         """Check for common function-related issues."""
         # Long function check
         line_count = func_info['end_line'] - func_info['line'] + 1
         if line_count > 50:  # Configurable threshold
-            self.issues.append({
-                'type': 'code_smell',
-                'severity': 'warning',
-                'message': f"Function '{func_info['name']}' is {line_count} lines long (consider breaking into smaller functions)",
-                'line': func_info['line'],
-                'rule': 'long-function'
-            })
+            self._emit('long-function', _CODE_SMELL, _WARNING, func_info['line'],
+                       "Function '{}' is {} lines long (consider breaking into smaller functions)",
+                       func_info['name'], line_count)
         
         # Missing docstring check
-        if not func_info['has_docstring'] and not func_info['name'].startswith('_'):
-            self.issues.append({
-                'type': 'code_smell',
-                'severity': 'info',
-                'message': f"Public function '{func_info['name']}' is missing a docstring",
-                'line': func_info['line'],
-                'rule': 'missing-docstring'
-            })
+        if not func_info['has_docstring'] and func_info['name'][0] != '_':
+            self._emit('missing-docstring', _CODE_SMELL, _INFO, func_info['line'],
+                       "Public function '{}' is missing a docstring", func_info['name'])
         
         # High complexity check
         if func_info['complexity'] > 10:  # Configurable threshold
-            self.issues.append({
-                'type': 'code_smell',
-                'severity': 'warning',
-                'message': f"Function '{func_info['name']}' has high cyclomatic complexity ({func_info['complexity']})",
-                'line': func_info['line'],
-                'rule': 'high-complexity'
-            })
-    
-    def _check_unused_variables(self, defined_names: set, used_names: set, lines: List[str]) -> None:
+            self._emit('high-complexity', _CODE_SMELL, _WARNING, func_info['line'],
+                       "Function '{}' has high cyclomatic complexity ({})",
+                       func_info['name'], func_info['complexity'])
+    
+    def _check_unused_variables(self, defined_names: Dict[str, int], used_names: set) -> None:
         """Check for variables that are defined but never used."""
-        # Exclude some common variable names that might be intentionally unused
-        exclude_patterns = {'_', '__', 'self', 'cls'}
+        if 'unused-variable' not in self.enabled_rules:
+            return
         
-        for name in defined_names:
+        for name, line_num in defined_names.items():
             if (name not in used_names and 
-                name not in exclude_patterns and 
-                not name.startswith('_')):
-                # Find the line where this variable was defined
-                line_num = 1
-                for i, line in enumerate(lines):
-                    if f"{name} =" in line or f"{name}:" in line:
-                        line_num = i + 1
-                        break
-                
-                self.issues.append({
-                    'type': 'code_smell',
-                    'severity': 'info',
-                    'message': f"Variable '{name}' is defined but never used",
-                    'line': line_num,
-                    'rule': 'unused-variable'
-                })
-    
-    def _check_python_specific_issues(self, node: ast.AST, lines: List[str]) -> None:
-        """Check for Python-specific code issues."""
-        for child in ast.walk(node):
-            # Check for bare except clauses
-            if isinstance(child, ast.ExceptHandler) and child.type is None:
-                self.issues.append({
-                    'type': 'potential_issue',
-                    'severity': 'warning',
-                    'message': "Bare 'except:' clause. Consider catching specific exceptions.",
-                    'line': child.lineno,
-                    'rule': 'bare-except'
-                })
-            
-            # Check for mutable default arguments
-            elif isinstance(child, ast.FunctionDef):
-                for default in child.args.defaults:
-                    if isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                        self.issues.append({
-                            'type': 'potential_issue',
-                            'severity': 'warning',
-                            'message': f"Mutable default argument in function '{child.name}'. Use None and create inside function.",
-                            'line': child.lineno,
-                            'rule': 'mutable-default-argument'
-                        })
-            
-            # Check for == comparison with None, True, False
-            elif isinstance(child, ast.Compare):
-                for comparator in child.comparators:
-                    if (isinstance(comparator, ast.Constant) and 
-                        comparator.value in [None, True, False]):
-                        if any(isinstance(op, ast.Eq) for op in child.ops):
-                            value_name = str(comparator.value)
-                            self.issues.append({
-                                'type': 'code_smell',
-                                'severity': 'info',
-                                'message': f"Use 'is' instead of '==' when comparing with {value_name}",
-                                'line': child.lineno,
-                                'rule': 'comparison-with-singleton'
-                            })
-            
-            # Check for string formatting issues
-            elif isinstance(child, ast.BinOp) and isinstance(child.op, ast.Mod):
-                if isinstance(child.left, ast.Constant) and isinstance(child.left.value, str):
-                    self.issues.append({
-                        'type': 'suggestion',
-                        'severity': 'info',
-                        'message': "Consider using f-strings or .format() instead of % formatting",
-                        'line': child.lineno,
-                        'rule': 'old-string-formatting'
-                    })
+                name not in _UNUSED_EXCLUDES and 
+                name[0] != '_'):
+                self._emit('unused-variable', _CODE_SMELL, _INFO, line_num,
+                           "Variable '{}' is defined but never used", name)
+    
+    def _check_bare_except(self, node: ast.ExceptHandler) -> None:
+        """Check for bare except clauses."""
+        if node.type is None:
+            self._emit('bare-except', _POTENTIAL_ISSUE, _WARNING, node.lineno,
+                       "Bare 'except:' clause. Consider catching specific exceptions.")
+    
+    def _check_mutable_defaults(self, node: ast.FunctionDef) -> None:
+        """Check for mutable default arguments."""
+        for default in node.args.defaults:
+            if type(default) in _MUTABLE_LITERAL_TYPES:
+                self._emit('mutable-default-argument', _POTENTIAL_ISSUE, _WARNING, node.lineno,
+                           "Mutable default argument in function '{}'. Use None and create inside function.",
+                           node.name)
+    
+    def _check_singleton_comparison(self, node: ast.Compare) -> None:
+        """Check for == comparison with None, True, False."""
+        if not any(type(op) is ast.Eq for op in node.ops):
+            return
+        
+        for comparator in node.comparators:
+            if type(comparator) is ast.Constant:
+                # Identity checks, since 0 == False and 1 == True
+                value = comparator.value
+                if value is None or value is True or value is False:
+                    self._emit('comparison-with-singleton', _CODE_SMELL, _INFO, node.lineno,
+                               "Use 'is' instead of '==' when comparing with {}", value)
+    
+    def _check_string_formatting(self, node: ast.BinOp) -> None:
+        """Check for string formatting issues."""
+        if type(node.op) is ast.Mod:
+            if type(node.left) is ast.Constant and type(node.left.value) is str:
+                self._emit('old-string-formatting', _SUGGESTION, _INFO, node.lineno,
+                           "Consider using f-strings or .format() instead of % formatting")
     
     def _has_docstring(self, node) -> bool:
         """Check if a function or class has a docstring."""
@@ -273,50 +471,140 @@ class PythonASTAnalyzer:
     
     def _get_decorator_name(self, decorator: ast.AST) -> str:
         """Get the name of a decorator."""
-        if isinstance(decorator, ast.Name):
-            return decorator.id
-        elif isinstance(decorator, ast.Attribute):
-            return f"{self._get_node_name(decorator.value)}.{decorator.attr}"
-        else:
-            return str(decorator)
+        return self._get_node_name(decorator)
     
     def _get_node_name(self, node: ast.AST) -> str:
         """Get the name representation of an AST node."""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Attribute):
-            return f"{self._get_node_name(node.value)}.{node.attr}"
+        # Collect attribute parts innermost-last and join once, rather than
+        # building a new string at every level of a dotted chain
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        
+        parts.append(node.id if isinstance(node, ast.Name) else str(node))
+        parts.reverse()
+        return '.'.join(parts)
+
+
+# Python-specific checks keyed by exact node type. AST node classes are never
+# subclassed by parsed code, so a type() lookup can replace isinstance chains.
+_CHECK_DISPATCH = {
+    ast.ExceptHandler: PythonASTAnalyzer._check_bare_except,
+    ast.FunctionDef: PythonASTAnalyzer._check_mutable_defaults,
+    ast.Compare: PythonASTAnalyzer._check_singleton_comparison,
+    ast.BinOp: PythonASTAnalyzer._check_string_formatting,
+}
+
+
+def _write_json(obj: Any, indent: bool = False) -> None:
+    """Write an object to stdout as JSON followed by a newline."""
+    if orjson:
+        # orjson encodes straight to bytes, so skip the text layer entirely
+        option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            encoded = orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            # orjson rejects lone surrogates, e.g. from non-UTF-8 file paths;
+            # json escapes them instead
+            pass
         else:
-            return str(node)
+            sys.stdout.buffer.write(encoded)
+            sys.stdout.buffer.flush()
+            return
+    
+    print(json.dumps(obj, indent=2 if indent else None), flush=True)
+
+
+def _analyze_path(file_path: str, enabled_rules: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """Analyze one file with a fresh analyzer."""
+    return PythonASTAnalyzer(enabled_rules).parse_file(file_path)
+
+
+def _parse_rules(value: str) -> FrozenSet[str]:
+    """Parse a comma-separated `--rules=` value, ignoring unknown rule ids."""
+    return frozenset(value.split(',')) & _ALL_RULES
+
+
+def serve(enabled_rules: Optional[FrozenSet[str]] = None) -> None:
+    """Answer analysis requests from stdin, one JSON result per line.
     
-    def _calculate_complexity(self, node: ast.FunctionDef) -> int:
-        """Calculate cyclomatic complexity of a function."""
-        complexity = 1  # Base complexity
+    Keeps a single interpreter alive across files so callers only pay the
+    startup and import cost once. Each request line is
+    `<request id>\t<file path>`, and every line gets exactly one reply
+    carrying the same `request_id`, so callers can match replies to
+    requests even when a request is malformed.
+    """
+    # Lines end only at '\n', so a '\r' is part of the path; surrogateescape
+    # keeps non-UTF-8 paths intact, as sys.argv does
+    sys.stdin.reconfigure(encoding='utf-8', errors='surrogateescape', newline='\n')
+    for line in sys.stdin:
+        if line.endswith('\n'):
+            line = line[:-1]
         
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.AsyncFor)):
-                complexity += 1
-            elif isinstance(child, ast.ExceptHandler):
-                complexity += 1
-            elif isinstance(child, ast.With):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
+        request_id, separator, file_path = line.partition('\t')
+        if not separator:
+            result = {
+                'success': False,
+                'error': 'invalid_request',
+                'message': 'Expected "<request id>\\t<file path>"'
+            }
+            request_id = None
+        elif not file_path:
+            result = {'success': False, 'error': 'missing_file_path'}
+        else:
+            result = _analyze_path(file_path, enabled_rules)
         
-        return complexity
+        result['request_id'] = request_id
+        _write_json(result)
+
+
+def batch(enabled_rules: Optional[FrozenSet[str]] = None) -> None:
+    """Analyze all newline-delimited file paths from stdin in parallel.
+    
+    Files are spread across one worker process per CPU. Results are written
+    as one JSON line per path, in the order the paths were given.
+    """
+    # Split only at '\n', as serve() does; splitlines() would also break
+    # paths at '\r', '\x0c', '\x1c'-'\x1e', '\x85' and '\u2028'/'\u2029'
+    sys.stdin.reconfigure(encoding='utf-8', errors='surrogateescape', newline='\n')
+    file_paths = [line for line in sys.stdin.read().split('\n') if line]
+    
+    analyze = partial(_analyze_path, enabled_rules=enabled_rules)
+    with ProcessPoolExecutor() as executor:
+        for result in executor.map(analyze, file_paths, chunksize=8):
+            _write_json(result)
 
 
 def main():
     """Main function to handle command line arguments."""
-    if len(sys.argv) != 2:
-        print(json.dumps({'success': False, 'error': 'missing_file_path'}))
+    args = sys.argv[1:]
+    
+    # --rules=a,b,c limits analysis to those rules; by default all run
+    enabled_rules = None
+    for arg in args:
+        if arg.startswith('--rules='):
+            enabled_rules = _parse_rules(arg[len('--rules='):])
+    args = [arg for arg in args if not arg.startswith('--rules=')]
+    
+    if args == ['--server']:
+        serve(enabled_rules)
+        return
+    
+    if args == ['--batch']:
+        batch(enabled_rules)
+        return
+    
+    if len(args) != 1:
+        _write_json({'success': False, 'error': 'missing_file_path'})
         sys.exit(1)
     
-    file_path = sys.argv[1]
-    analyzer = PythonASTAnalyzer()
+    file_path = args[0]
+    analyzer = PythonASTAnalyzer(enabled_rules)
     result = analyzer.parse_file(file_path)
     
-    print(json.dumps(result, indent=2))
+    _write_json(result, indent=True)
+    print(f"analysis cache: {_cache_stats['hits']} hit(s), {_cache_stats['misses']} miss(es)", file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,239 @@
+"""
+Tests for the Python AST parser.
+Run with: python -m unittest discover python-analyzer
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import ast_parser
+from ast_parser import PythonASTAnalyzer
+
+
+SOURCE = '''\
+def handler():
+    """Swallow everything."""
+    unused = 1
+    try:
+        pass
+    except:
+        pass
+'''
+
+
+class EnabledRulesTest(unittest.TestCase):
+    """Analyzer behaviour when only some rules are enabled."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        # Keep the real cache directory untouched
+        original_cache_dir = ast_parser.CACHE_DIR
+        ast_parser.CACHE_DIR = Path(self.tmp.name) / 'cache'
+        self.addCleanup(setattr, ast_parser, 'CACHE_DIR', original_cache_dir)
+
+        self.file_path = os.path.join(self.tmp.name, 'sample.py')
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write(SOURCE)
+
+    def _rules(self, result):
+        return {issue['rule'] for issue in result['issues']}
+
+    def test_disabled_rule_produces_no_issues(self):
+        result = PythonASTAnalyzer(frozenset({'unused-variable'})).parse_file(self.file_path)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(self._rules(result), {'unused-variable'})
+
+    def test_all_rules_enabled_by_default(self):
+        result = PythonASTAnalyzer().parse_file(self.file_path)
+
+        self.assertEqual(self._rules(result), {'unused-variable', 'bare-except'})
+
+    def test_rule_subset_gets_distinct_cache_key(self):
+        subset = frozenset({'unused-variable'})
+
+        self.assertNotEqual(ast_parser._cache_key(SOURCE, subset),
+                            ast_parser._cache_key(SOURCE, ast_parser._ALL_RULES))
+        self.assertEqual(ast_parser._cache_key(SOURCE, subset),
+                         ast_parser._cache_key(SOURCE, frozenset(subset)))
+
+    def test_parse_rules_ignores_unknown_ids(self):
+        self.assertEqual(ast_parser._parse_rules('bare-except,syntax_error'),
+                         frozenset({'bare-except'}))
+        self.assertEqual(ast_parser._parse_rules(''), frozenset())
+
+    def test_filtered_results_not_served_from_full_cache(self):
+        PythonASTAnalyzer().parse_file(self.file_path)
+        result = PythonASTAnalyzer(frozenset({'unused-variable'})).parse_file(self.file_path)
+
+        self.assertEqual(self._rules(result), {'unused-variable'})
+        # A repeat run with the same rules is a cache hit with the same issues
+        hits = ast_parser._cache_stats['hits']
+        repeat = PythonASTAnalyzer(frozenset({'unused-variable'})).parse_file(self.file_path)
+        self.assertEqual(ast_parser._cache_stats['hits'], hits + 1)
+        self.assertEqual(repeat['issues'], result['issues'])
+
+
+class ChecksTest(unittest.TestCase):
+    """Individual checks run on parsed source."""
+
+    def _analyze(self, source):
+        analyzer = PythonASTAnalyzer()
+        analyzer._analyze_node(ast.parse(source))
+        return analyzer
+
+    def _lines(self, analyzer, rule):
+        return [issue['line'] for issue in analyzer.issues if issue['rule'] == rule]
+
+    def test_singleton_comparison_ignores_ints(self):
+        analyzer = self._analyze('a = x == 0\nb = x == None\nc = x == True\nd = x != 1\n')
+
+        self.assertEqual(self._lines(analyzer, 'comparison-with-singleton'), [2, 3])
+
+    def test_unused_variable_reported_at_first_definition(self):
+        analyzer = self._analyze(
+            'import os\n'
+            '\n'
+            'class Config:\n'
+            '    pass\n'
+            '\n'
+            'for item in os.listdir():\n'
+            '    total = 1\n'
+            'total = 2\n'
+        )
+
+        issues = {issue['message'].split("'")[1]: issue['line']
+                  for issue in analyzer.issues if issue['rule'] == 'unused-variable'}
+        self.assertEqual(issues, {'Config': 3, 'item': 6, 'total': 7})
+
+    def test_nested_function_complexity(self):
+        analyzer = self._analyze(
+            'def outer(a, b):\n'
+            '    if a:\n'
+            '        pass\n'
+            '    def inner():\n'
+            '        if a and b:\n'
+            '            pass\n'
+            '    def sibling():\n'
+            '        pass\n'
+            '    return inner, sibling\n'
+            '\n'
+            'def after(a):\n'
+            '    while a:\n'
+            '        pass\n'
+        )
+
+        complexity = {func['name']: func['complexity'] for func in analyzer.symbols['functions']}
+        # inner's own branches count towards outer as well
+        self.assertEqual(complexity, {'outer': 4, 'inner': 3, 'sibling': 1, 'after': 2})
+
+
+class PruneCacheTest(unittest.TestCase):
+    """Cleanup of the on-disk result cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        original_cache_dir = ast_parser.CACHE_DIR
+        ast_parser.CACHE_DIR = Path(self.tmp.name)
+        self.addCleanup(setattr, ast_parser, 'CACHE_DIR', original_cache_dir)
+
+        # Sets the analyzer fingerprint that pruning compares against
+        self.key = ast_parser._cache_key(SOURCE, ast_parser._ALL_RULES)
+
+    def _touch(self, name, age=0):
+        path = Path(self.tmp.name) / name
+        path.write_text('{}')
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_removes_stale_temporary_files(self):
+        stale = self._touch('junk.tmp', age=ast_parser._CACHE_TMP_MAX_AGE + 60)
+        fresh = self._touch('inflight.tmp')
+
+        ast_parser._prune_cache()
+
+        self.assertFalse(stale.exists())
+        self.assertTrue(fresh.exists())
+
+    def test_removes_entries_from_other_analyzer_versions(self):
+        current = self._touch(f"{self.key}.json")
+        outdated = self._touch('abc-cpython-311-0123456789abcdef.json')
+
+        ast_parser._prune_cache()
+
+        self.assertTrue(current.exists())
+        self.assertFalse(outdated.exists())
+
+
+class ServeTest(unittest.TestCase):
+    """The --server request protocol."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.file_path = os.path.join(self.tmp.name, 'sample.py')
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write(SOURCE)
+
+    def _serve(self, requests, *options):
+        env = dict(os.environ, XDG_CACHE_HOME=os.path.join(self.tmp.name, 'cache'))
+        output = subprocess.run(
+            [sys.executable, ast_parser.__file__, '--server', *options],
+            input=requests, capture_output=True, text=True, env=env, check=True
+        ).stdout
+        return [json.loads(line) for line in output.splitlines()]
+
+    def test_every_line_gets_a_reply_with_its_id(self):
+        replies = self._serve(f"1\t{self.file_path}\n\n2\t\n3\t{self.file_path}\n")
+
+        self.assertEqual([reply['request_id'] for reply in replies], ['1', None, '2', '3'])
+        self.assertEqual([reply['success'] for reply in replies], [True, False, False, True])
+        self.assertEqual(replies[2]['error'], 'missing_file_path')
+
+    def test_rules_option_limits_issues(self):
+        replies = self._serve(f"1\t{self.file_path}\n", '--rules=bare-except')
+
+        self.assertEqual({issue['rule'] for issue in replies[0]['issues']}, {'bare-except'})
+
+    def test_carriage_return_is_part_of_the_path(self):
+        replies = self._serve(f"1\t{self.file_path}\r\n")
+
+        self.assertEqual(replies[0]['error'], 'parse_error')
+        self.assertIn('\\r', replies[0]['message'])
+
+
+class BatchTest(unittest.TestCase):
+    """Path splitting in --batch mode."""
+
+    def test_paths_split_only_at_newlines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, 'odd\x0cname\u2028.py')
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(SOURCE)
+
+            env = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmp, 'cache'))
+            output = subprocess.run(
+                [sys.executable, ast_parser.__file__, '--batch'],
+                input=f"{file_path}\n\n{file_path}", capture_output=True,
+                text=True, encoding='utf-8', env=env, check=True
+            ).stdout
+
+        replies = [json.loads(line) for line in output.split('\n') if line]
+        self.assertEqual([reply['success'] for reply in replies], [True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -95,7 +95,13 @@ export class AnalysisEngine {
     // Handle Python files differently
     if (language === 'python') {
       console.log('🐍 Using Python analyzer')
-      const pythonReport = await this.pythonAnalyzer.analyzeFile(filePath)
+      // Skip disabled rules in the analyzer itself rather than only
+      // filtering their results afterwards
+      this.configManager.refresh()
+      const pythonReport = await this.pythonAnalyzer.analyzeFile(
+        filePath,
+        this.configManager.getEnabledRules('python')
+      )
 
       // Apply configuration filtering to Python results
       console.log('🎯 Applying configuration filtering to Python results')
@@ -270,4 +276,11 @@ export class AnalysisEngine {
   getConfigurationManager(): ConfigurationManager {
     return this.configManager
   }
+
+  /**
+   * Release resources held by the analyzers
+   */
+  dispose(): void {
+    this.pythonAnalyzer.dispose()
+  }
 }
@@ -325,6 +325,7 @@ export class CodeSurferExtension {
 
   public dispose(): void {
     this.decorationManager.dispose()
+    this.analysisEngine.dispose()
     this.currentAnalysis.clear()
   }
 }
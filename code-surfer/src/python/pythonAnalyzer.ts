@@ -14,8 +14,24 @@ import {
 } from '../types'
 import { PythonAnalysisResult, PythonIssue } from './pythonTypes'
 
+interface PendingRequest {
+  resolve: (result: PythonAnalysisResult) => void
+  reject: (error: Error) => void
+  timer: NodeJS.Timeout
+  server: cp.ChildProcessWithoutNullStreams
+}
+
+// How long a single file may take before the analyzer server is replaced
+const REQUEST_TIMEOUT_MS = 30000
+
 export class PythonAnalyzer {
   private pythonScriptPath: string
+  private serverProcess: cp.ChildProcessWithoutNullStreams | undefined
+  private pythonCommand: Promise<string> | undefined
+  // Comma-separated rules the current server was started with, if any
+  private serverRules: string | undefined
+  private pendingRequests = new Map<string, PendingRequest>()
+  private nextRequestId = 0
 
   constructor(extensionPath?: string) {
     // Path to the Python AST parser script
@@ -45,12 +61,21 @@ export class PythonAnalyzer {
 
   /**
    * Analyze a Python file using the Python AST parser
+   *
+   * When `enabledRules` is given, only those rules are run; otherwise the
+   * analyzer runs every rule it knows.
    */
-  async analyzeFile(filePath: string): Promise<AnalysisReport> {
+  async analyzeFile(
+    filePath: string,
+    enabledRules?: string[]
+  ): Promise<AnalysisReport> {
     console.log('🐍 PythonAnalyzer.analyzeFile called for:', filePath)
     try {
       console.log('🔧 Running Python analyzer script...')
-      const pythonResult = await this.runPythonAnalyzer(filePath)
+      const pythonResult = await this.runPythonAnalyzer(
+        filePath,
+        enabledRules
+      )
       console.log('✅ Python analyzer result:', {
         success: pythonResult.success,
         issueCount: pythonResult.issues?.length || 0,
@@ -147,40 +172,210 @@ export class PythonAnalyzer {
 
   /**
    * Run the Python AST analyzer script
+   *
+   * Requests go to a long-running analyzer process (started with `--server`)
+   * so the interpreter startup cost is paid once rather than per file.
+   * Each request is written as `<request id>\t<file path>` and the server
+   * echoes the id in its JSON reply, which is how replies are matched.
+   * The enabled rules are fixed per server, so a change restarts it.
    */
   private async runPythonAnalyzer(
-    filePath: string
+    filePath: string,
+    enabledRules?: string[]
   ): Promise<PythonAnalysisResult> {
-    const pythonCmd = await this.getPythonCommand()
+    if (!filePath || /[\r\n]/.test(filePath)) {
+      throw new Error(
+        `Cannot send path to Python analyzer: ${JSON.stringify(filePath)}`
+      )
+    }
+
+    const rules = enabledRules && [...enabledRules].sort().join(',')
+    const server = await this.getServer(rules)
+    const requestId = String(this.nextRequestId++)
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        const error = new Error(
+          `Python analyzer timed out after ${REQUEST_TIMEOUT_MS} ms on ${filePath}`
+        )
+        // A stuck request would block every later one, so replace the server
+        this.stopServer(server, error)
+      }, REQUEST_TIMEOUT_MS)
+
+      this.pendingRequests.set(requestId, { resolve, reject, timer, server })
+      server.stdin.write(`${requestId}\t${filePath}\n`)
+    })
+  }
+
+  /**
+   * Remove a pending request and cancel its timeout
+   */
+  private takeRequest(requestId: string): PendingRequest | undefined {
+    const request = this.pendingRequests.get(requestId)
+    if (request) {
+      clearTimeout(request.timer)
+      this.pendingRequests.delete(requestId)
+    }
+    return request
+  }
+
+  /**
+   * Get the running analyzer server, starting it if needed
+   */
+  private async getServer(
+    rules: string | undefined
+  ): Promise<cp.ChildProcessWithoutNullStreams> {
+    if (!this.pythonCommand) {
+      this.pythonCommand = this.getPythonCommand()
+    }
+    const pythonCmd = await this.pythonCommand
+
+    // Nothing below awaits, so concurrent callers share one server
+    if (this.serverProcess && this.serverRules !== rules) {
+      this.retireServer()
+    }
+    return this.serverProcess ?? this.startServer(pythonCmd, rules)
+  }
+
+  /**
+   * Spawn the analyzer in server mode and wire up its streams
+   */
+  private startServer(
+    pythonCmd: string,
+    rules: string | undefined
+  ): cp.ChildProcessWithoutNullStreams {
     console.log('🔧 Python command:', pythonCmd)
     console.log('📁 Python script path:', this.pythonScriptPath)
 
-    return new Promise((resolve, reject) => {
-      const command = `${pythonCmd} "${this.pythonScriptPath}" "${filePath}"`
-      console.log('⚡ Executing command:', command)
+    const args = [this.pythonScriptPath, '--server']
+    if (rules !== undefined) {
+      args.push(`--rules=${rules}`)
+    }
+    const server = cp.spawn(pythonCmd, args)
+    this.serverProcess = server
+    this.serverRules = rules
+    console.log('⚡ Started Python analyzer server, pid:', server.pid)
 
-      cp.exec(command, { maxBuffer: 1024 * 1024 }, (error, stdout, stderr) => {
-        if (error) {
-          reject(
-            new Error(
-              `Python analyzer failed: ${error.message}\nStderr: ${stderr}`
-            )
-          )
-          return
-        }
+    // Replies are matched by request id, so a retired server can keep
+    // answering its remaining requests after a new one has started
+    let output = ''
+    server.stdout.setEncoding('utf8')
+    server.stdout.on('data', (chunk: string) => {
+      output += chunk
 
-        try {
-          const result: PythonAnalysisResult = JSON.parse(stdout)
-          resolve(result)
-        } catch (parseError) {
-          reject(
-            new Error(
-              `Failed to parse Python analyzer output: ${parseError}\nOutput: ${stdout}`
-            )
-          )
-        }
-      })
+      let newlineIndex = output.indexOf('\n')
+      while (newlineIndex !== -1) {
+        this.handleServerReply(output.slice(0, newlineIndex))
+        output = output.slice(newlineIndex + 1)
+        newlineIndex = output.indexOf('\n')
+      }
     })
+    server.stderr.on('data', (chunk: Buffer) =>
+      console.error('🐍 Python analyzer stderr:', chunk.toString())
+    )
+
+    const onFailure = (error: Error) => this.forgetServer(server, error)
+    server.on('error', (error) =>
+      onFailure(new Error(`Python analyzer failed: ${error.message}`))
+    )
+    server.stdin.on('error', (error) =>
+      onFailure(new Error(`Python analyzer failed: ${error.message}`))
+    )
+    // 'close' waits for stdout to drain, so a retired server's last replies
+    // are delivered before its remaining requests are failed
+    server.on('close', (code, signal) =>
+      onFailure(
+        new Error(
+          `Python analyzer exited unexpectedly (code ${code}, signal ${signal})`
+        )
+      )
+    )
+
+    return server
+  }
+
+  /**
+   * Resolve the request answered by one line of server output
+   */
+  private handleServerReply(line: string): void {
+    let result: PythonAnalysisResult
+    try {
+      result = JSON.parse(line)
+    } catch (parseError) {
+      // Without an id the line cannot be matched; its request times out
+      console.error(
+        `Failed to parse Python analyzer output: ${parseError}\nOutput: ${line}`
+      )
+      return
+    }
+
+    const request =
+      result.request_id != null
+        ? this.takeRequest(result.request_id)
+        : undefined
+    if (!request) {
+      console.error('Unmatched Python analyzer reply:', line)
+      return
+    }
+    request.resolve(result)
+  }
+
+  /**
+   * Forget a server and fail any requests still waiting on it
+   */
+  private forgetServer(
+    server: cp.ChildProcessWithoutNullStreams,
+    error: Error
+  ): void {
+    if (this.serverProcess === server) {
+      this.serverProcess = undefined
+      this.serverRules = undefined
+    }
+
+    for (const [requestId, request] of this.pendingRequests) {
+      if (request.server === server) {
+        this.takeRequest(requestId)
+        request.reject(error)
+      }
+    }
+  }
+
+  /**
+   * Let the current server finish its pending requests and exit, so the
+   * next request starts a fresh one
+   */
+  private retireServer(): void {
+    const server = this.serverProcess
+    this.serverProcess = undefined
+    this.serverRules = undefined
+    server?.stdin.end()
+  }
+
+  /**
+   * Kill a server and fail any requests still waiting on it
+   */
+  private stopServer(
+    server: cp.ChildProcessWithoutNullStreams,
+    error: Error
+  ): void {
+    this.forgetServer(server, error)
+    server.stdin.end()
+    server.kill()
+  }
+
+  /**
+   * Stop the analyzer server
+   */
+  dispose(): void {
+    const error = new Error('Python analyzer was disposed')
+    if (this.serverProcess) {
+      this.stopServer(this.serverProcess, error)
+    }
+
+    // Requests still draining on retired servers
+    for (const requestId of [...this.pendingRequests.keys()]) {
+      this.takeRequest(requestId)?.reject(error)
+    }
   }
 
   /**
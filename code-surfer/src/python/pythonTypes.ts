@@ -57,5 +57,6 @@ export interface PythonAnalysisResult {
   file_path?: string
   error?: string
   message?: string
-  traceback?: string
+  traceback?: string | null
+  request_id?: string | null
 }